@@ -76,51 +76,43 @@ class TtsGenerator
     filename = "#{@entry.id}_#{content_hash[0, 16]}"
     output_base = CACHE_DIR.join(filename)
 
-    # Create temp file with text content
-    text_file = Tempfile.new([ "tts_text", ".txt" ])
-    text_file.write(text)
-    text_file.close
+    # Call Python script, passing the text on stdin
+    result = execute_python_script(text, output_base)
+    return result unless result.success
 
-    begin
-      # Call Python script
-      result = execute_python_script(text_file.path, output_base)
-      return result unless result.success
+    # Parse result JSON
+    audio_path = output_base.sub_ext(".wav")
+    json_path = output_base.sub_ext(".json")
 
-      # Parse result JSON
-      audio_path = output_base.sub_ext(".wav")
-      json_path = output_base.sub_ext(".json")
+    unless File.exist?(audio_path) && File.exist?(json_path)
+      return error_result("TTS generation did not produce expected output files")
+    end
 
-      unless File.exist?(audio_path) && File.exist?(json_path)
-        return error_result("TTS generation did not produce expected output files")
-      end
+    # Read timestamps from JSON
+    json_data = JSON.parse(File.read(json_path))
+    File.delete(json_path) # Clean up JSON file, we store timestamps in DB
+
+    # Create cache record
+    cached_audio = CachedAudio.create!(
+      entry: @entry,
+      audio_filename: "#{filename}.wav",
+      content_hash: content_hash,
+      duration: json_data["duration"],
+      timestamps: json_data["timestamps"],
+      cached_at: Time.current
+    )
 
-      # Read timestamps from JSON
-      json_data = JSON.parse(File.read(json_path))
-      File.delete(json_path) # Clean up JSON file, we store timestamps in DB
-
-      # Create cache record
-      cached_audio = CachedAudio.create!(
-        entry: @entry,
-        audio_filename: "#{filename}.wav",
-        content_hash: content_hash,
-        duration: json_data["duration"],
-        timestamps: json_data["timestamps"],
-        cached_at: Time.current
-      )
-
-      GenerationResult.new(success: true, cached_audio: cached_audio, error: nil)
-    ensure
-      text_file.unlink
-    end
+    GenerationResult.new(success: true, cached_audio: cached_audio, error: nil)
   end
 
-  def execute_python_script(text_path, output_base)
+  def execute_python_script(text, output_base)
     stdout, stderr, status = Open3.capture3(
       VENV_PYTHON.to_s,
       PYTHON_SCRIPT.to_s,
-      "--input", text_path.to_s,
+      "--input", "-",
       "--output", output_base.to_s,
       "--json-only",
+      stdin_data: text,
       chdir: Rails.root.to_s
     )
 
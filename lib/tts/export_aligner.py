@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Export the ForceAlign wav2vec2 model to ONNX for Nibbler's TTS pipeline
+
+generate.py runs word alignment through ONNX Runtime when the exported model
+is present, and falls back to the PyTorch checkpoint otherwise. Run this once
+after installing the TTS dependencies, and again if an earlier export lacks
+the lengths input that masks padding in batched alignment.
+
+Usage:
+    python lib/tts/export_aligner.py
+
+Output:
+    - lib/tts/models/wav2vec2.onnx - wav2vec2 acoustic model emitting
+      log-probabilities over ForceAlign's character labels
+    - lib/tts/models/wav2vec2.int8.onnx - Same model with int8 weights
+      (skipped with --no-quantize)
+"""
+
+import argparse
+from pathlib import Path
+
+import torch
+import torchaudio
+
+from generate import ALIGNER_MODEL_PATH, ALIGNER_QUANTIZED_MODEL_PATH
+
+
+class EmissionModel(torch.nn.Module):
+    """wav2vec2 model returning log-probabilities, as ForceAlign consumes them."""
+
+    def __init__(self, model: torch.nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(self, waveform: torch.Tensor, lengths: torch.Tensor) -> torch.Tensor:
+        # lengths masks the zero padding of shorter clips out of attention
+        emissions, _ = self.model(waveform, lengths)
+        return torch.log_softmax(emissions, dim=-1)
+
+
+def export(output_path: Path) -> Path:
+    """Export the wav2vec2 alignment model to ONNX.
+
+    Args:
+        output_path: Path for the exported .onnx file
+
+    Returns:
+        Path to the exported model
+    """
+    bundle = torchaudio.pipelines.WAV2VEC2_ASR_BASE_960H
+    model = EmissionModel(bundle.get_model()).eval()
+
+    # One second of silence; the batch and time axes are dynamic
+    dummy_waveform = torch.zeros(1, bundle.sample_rate)
+    dummy_lengths = torch.tensor([bundle.sample_rate])
+
+    with torch.inference_mode():
+        torch.onnx.export(
+            model,
+            (dummy_waveform, dummy_lengths),
+            str(output_path),
+            input_names=["input", "lengths"],
+            output_names=["emissions"],
+            dynamic_axes={
+                "input": {0: "batch", 1: "T"},
+                "lengths": {0: "batch"},
+                "emissions": {0: "batch", 1: "frames"},
+            },
+            opset_version=14,
+        )
+
+    infer_shapes(output_path)
+
+    return output_path
+
+
+def infer_shapes(model_path: Path) -> None:
+    """Annotate the exported model with symbolic tensor shapes, in place.
+
+    Without them ONNX Runtime cannot resolve the shape subgraphs at session
+    creation and pins them to the CPU, adding Memcpy nodes around them when
+    running on CUDA. Quantization also works best on a shape-annotated model.
+
+    Args:
+        model_path: Path to the .onnx model
+    """
+    import onnx
+    from onnxruntime.tools.symbolic_shape_infer import SymbolicShapeInference
+
+    model = SymbolicShapeInference.infer_shapes(onnx.load(str(model_path)), auto_merge=True)
+    onnx.save(model, str(model_path))
+
+
+def quantize(model_path: Path, output_path: Path) -> Path:
+    """Quantize the exported model's weights to int8.
+
+    Only MatMul weights are quantized: they dominate the transformer layers,
+    while the convolutional feature extractor is sensitive to quantization.
+
+    Args:
+        model_path: Path to the float32 .onnx model
+        output_path: Path for the quantized .onnx file
+
+    Returns:
+        Path to the quantized model
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(
+        str(model_path),
+        str(output_path),
+        op_types_to_quantize=["MatMul"],
+        weight_type=QuantType.QInt8,
+    )
+
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export the wav2vec2 alignment model to ONNX"
+    )
+    parser.add_argument(
+        "--output", "-o",
+        type=Path,
+        default=ALIGNER_MODEL_PATH,
+        help=f"Output path (default: {ALIGNER_MODEL_PATH})",
+    )
+    parser.add_argument(
+        "--quantized-output",
+        type=Path,
+        default=ALIGNER_QUANTIZED_MODEL_PATH,
+        help=f"Quantized output path (default: {ALIGNER_QUANTIZED_MODEL_PATH})",
+    )
+    parser.add_argument(
+        "--no-quantize",
+        action="store_true",
+        help="Skip writing the int8 quantized model",
+    )
+
+    args = parser.parse_args()
+
+    path = export(args.output)
+    print(f"Exported: {path}")
+
+    if not args.no_quantize:
+        quantized_path = quantize(path, args.quantized_output)
+        print(f"Quantized: {quantized_path}")
+
+
+if __name__ == "__main__":
+    main()
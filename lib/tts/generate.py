@@ -2,12 +2,14 @@
 """
 TTS Generation Script for Nibbler RSS Reader
 
-Generates audio from text using Piper TTS and extracts word-level timestamps
-using ForceAlign (wav2vec2 forced alignment).
+Generates audio from text using Piper TTS (run in-process via ONNX Runtime)
+and extracts word-level timestamps, from Piper's own phoneme alignments for
+short texts and using ForceAlign (wav2vec2 forced alignment) otherwise.
 
 Usage:
     python lib/tts/generate.py --text "Text to speak" --output /path/to/output
     python lib/tts/generate.py --input /path/to/text.txt --output /path/to/output
+    echo "Text to speak" | python lib/tts/generate.py --input - --output /path/to/output
 
 Output:
     - {output}.wav - Audio file
@@ -16,159 +18,874 @@ Output:
 Example:
     python lib/tts/generate.py --text "Hello world" --output /tmp/hello
     # Creates /tmp/hello.wav and /tmp/hello.json
+
+Server mode:
+    python lib/tts/generate.py --serve
+    # Keeps the models loaded; later invocations hand their text to this
+    # process over tmp/sockets/tts.sock instead of loading models themselves
 """
 
 import argparse
+import concurrent.futures
+import errno
+import hashlib
 import json
 import os
-import subprocess
+import re
+import shutil
+import socket
+import socketserver
 import sys
-import tempfile
+import wave
 from pathlib import Path
 
+import numpy as np
+import orjson
+
 # Add the project root to path for imports
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 MODELS_DIR = PROJECT_ROOT / "lib" / "tts" / "models"
-VENV_BIN = PROJECT_ROOT / ".venv" / "bin"
 
 # Piper model configuration
 DEFAULT_MODEL = "en_US-lessac-medium"
 MODEL_PATH = MODELS_DIR / f"{DEFAULT_MODEL}.onnx"
+CONFIG_PATH = MODELS_DIR / f"{DEFAULT_MODEL}.onnx.json"
+
+# wav2vec2 alignment models exported by lib/tts/export_aligner.py; the int8
+# quantized variant is preferred when present
+ALIGNER_MODEL_PATH = MODELS_DIR / "wav2vec2.onnx"
+ALIGNER_QUANTIZED_MODEL_PATH = MODELS_DIR / "wav2vec2.int8.onnx"
+
+# Clips are only batched through the aligner together when the longest is at
+# most this fraction longer than the shortest (see compute_emissions)
+ALIGNER_BATCH_MAX_PADDING = 0.1
+
+# Generated audio + timestamps, keyed by a hash of the text and settings.
+# Bounded by total size, since one long article alone can be 100MB of audio;
+# TTS_CACHE_MAX_MB overrides the limit.
+CACHE_DIR = PROJECT_ROOT / "tmp" / "cache" / "tts"
+CACHE_MAX_BYTES = int(os.environ.get("TTS_CACHE_MAX_MB", "200")) * 1024 * 1024
+
+# Unix socket of a long-running generate.py --serve process, which keeps the
+# models loaded between requests. Lives in the app's own tmp/ rather than a
+# shared, world-writable directory where another user could claim the name.
+DEFAULT_SOCKET_PATH = PROJECT_ROOT / "tmp" / "sockets" / "tts.sock"
+
+# Seconds to wait for a --serve process to accept a request, and to finish it
+SERVER_CONNECT_TIMEOUT = 5
+SERVER_TIMEOUT = 300
+
+# Texts up to this many words take word timings from Piper's phoneme
+# alignments instead of running ForceAlign (unless --precise-align is given)
+PHONEME_TIMING_MAX_WORDS = 100
+
+# Sentence boundaries for pipelining long texts: whitespace after . ! or ?
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+# A fragment ending in a title or other common abbreviation ("Mr.", "Inc.")
+# or in initials ("U.S.") is not a sentence; fragments shorter than
+# SENTENCE_MIN_WORDS are merged into what follows too, so Piper never gives
+# them end-of-sentence intonation
+ABBREVIATIONS = [
+    "Mr", "Mrs", "Ms", "Dr", "Prof", "Rev", "Sr", "Jr", "St", "Mt", "Ave", "Blvd",
+    "Gen", "Col", "Lt", "Capt", "Sgt", "Gov", "Sen", "Rep", "Pres",
+    "Inc", "Ltd", "Co", "Corp", "Bros", "vs", "approx", "Fig", "Vol",
+    "Jan", "Feb", "Mar", "Apr", "Jun", "Jul", "Aug", "Sep", "Sept", "Oct", "Nov", "Dec",
+]
+ABBREVIATION_END = re.compile(rf"\b(?:{'|'.join(ABBREVIATIONS)})\.$|\b(?:[A-Za-z]\.){{2,}}$")
+SENTENCE_MIN_WORDS = 3
+
+# Text espeak may speak as a different number of words than ForceAlign's
+# letters-only transcript has: digits, symbols, hyphenated compounds, acronyms
+# and dotted initials. An expansion can cancel out a merge elsewhere (espeak
+# runs some unstressed pairs like "in the" together), leaving the word count
+# right but every later word on the wrong span, so such texts skip phoneme
+# timing altogether.
+SPOKEN_EXPANSION = re.compile(r"[0-9%&@#$€£+=/°§]|\w-\w|\b[A-Z]{2,}\b|\b(?:[A-Za-z]\.){2,}")
+
+# Punctuation phonemes emitted by espeak; they mark pauses, not speech
+PUNCTUATION_PHONEMES = set(",.;:!?¡¿—…\"«»“”()")
 
 # Padding to prevent word clipping (in seconds)
 SILENCE_PADDING_START = 0.15  # 150ms at start
 SILENCE_PADDING_END = 0.25    # 250ms at end
 
+# Audio format produced by the Piper voice (see the model's .onnx.json)
+SAMPLE_RATE = 22050
+SAMPLE_WIDTH = 2  # int16
+
+# Padding silence, built once; silence in signed PCM is all zero bytes
+_START_SILENCE = b"\x00" * (int(SILENCE_PADDING_START * SAMPLE_RATE) * SAMPLE_WIDTH)
+_END_SILENCE = b"\x00" * (int(SILENCE_PADDING_END * SAMPLE_RATE) * SAMPLE_WIDTH)
+
+# Piper voices, loaded once per thread count on first use (see get_voice)
+_VOICES = {}
+
+# wav2vec2 acoustic model used by ForceAlign, loaded once on first use; ONNX
+# Runtime sessions per thread count (see get_aligner_model / get_aligner_session)
+_ALIGNER_MODEL = None
+_ALIGNER_SESSIONS = {}
+
+# Device for the wav2vec2 aligner, "cpu" or "cuda" (see set_aligner_device).
+# Piper always runs on the CPU, where it is faster than on a GPU.
+_ALIGNER_DEVICE = "cpu"
+
+# Cores given to each of Piper and the aligner while they run side by side in
+# synthesize_and_align; giving each every core would oversubscribe the
+# machine twice over. Either one running alone uses every core.
+STAGE_THREADS = max(1, (os.cpu_count() or 2) // 2)
 
-def add_silence_padding(input_path: Path, output_path: Path, start_pad: float, end_pad: float) -> Path:
-    """Add silence padding to audio file using ffmpeg.
+# Worker thread for loading the aligner and cache cleanup while Piper
+# synthesizes on the main thread (see run_in_background)
+_BACKGROUND = None
+_ALIGNER_PRELOAD = None
+
+
+def create_session(
+    model_path: Path,
+    providers: list[str] | None = None,
+    load_model=None,
+    num_threads: int | None = None,
+    variant: str | None = None,
+):
+    """Create an ONNX Runtime session tuned for this machine.
+
+    Spreads each operator over num_threads cores and fuses the graph as far as
+    ONNX Runtime can. On the CPU, the fused graph is saved next to the model
+    on first use (as .ort-<version>[.<variant>].opt.onnx) and loaded from
+    there afterwards.
 
     Args:
-        input_path: Path to input WAV file
-        output_path: Path for output WAV file
-        start_pad: Seconds of silence to add at start
-        end_pad: Seconds of silence to add at end
+        model_path: Path to the .onnx model
+        providers: Execution providers in priority order (default: CPU only)
+        load_model: Optional function returning serialized model bytes to
+            use instead of the file at model_path
+        num_threads: Intra-op thread count (default: every core)
+        variant: Name for what load_model changes about the model, kept in
+            the saved graph's file name so differently built graphs never
+            stand in for each other
 
     Returns:
-        Path to the padded WAV file
+        ONNX Runtime session
     """
-    # Use ffmpeg to add silence padding using adelay and apad filters
-    # adelay adds silence at the start, apad adds silence at the end
-    # Format: adelay=START_MS|START_MS (stereo), apad=pad_dur=END_S
-    start_ms = int(start_pad * 1000)
-
-    ffmpeg_cmd = [
-        "ffmpeg",
-        "-y",  # Overwrite output
-        "-i", str(input_path),
-        "-af", f"adelay={start_ms}|{start_ms},apad=pad_dur={end_pad}",
-        "-ar", "22050",  # Keep sample rate consistent with Piper output
-        str(output_path),
+    import onnxruntime
+
+    providers = providers or ["CPUExecutionProvider"]
+
+    sess_options = onnxruntime.SessionOptions()
+    sess_options.intra_op_num_threads = num_threads or os.cpu_count()
+    sess_options.inter_op_num_threads = 1
+    sess_options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+    sess_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    # Idle worker threads sleep instead of spin-waiting between runs, since
+    # Piper and the aligner run side by side
+    sess_options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+
+    # Optimized graphs can contain provider-specific nodes, so only keep them
+    # for the CPU. The saved graph stops at the portable (extended) level and
+    # is named after the ONNX Runtime version that wrote it; the hardware
+    # specific layout passes still run on every load.
+    variant_suffix = f".{variant}" if variant else ""
+    optimized_path = model_path.with_suffix(f".ort-{onnxruntime.__version__}{variant_suffix}.opt.onnx")
+    save_optimized = providers == ["CPUExecutionProvider"] and os.access(model_path.parent, os.W_OK)
+    is_stale = not optimized_path.exists() or optimized_path.stat().st_mtime < model_path.stat().st_mtime
+    if save_optimized and is_stale:
+        # Write under a temporary name so concurrent processes never load a
+        # partially written model
+        temp_path = optimized_path.with_suffix(f".{os.getpid()}.tmp")
+        save_options = onnxruntime.SessionOptions()
+        save_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+        save_options.optimized_model_filepath = str(temp_path)
+        try:
+            model = load_model() if load_model else str(model_path)
+            onnxruntime.InferenceSession(model, sess_options=save_options, providers=providers)
+            os.replace(temp_path, optimized_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+    if save_optimized:
+        model = str(optimized_path)
+    else:
+        model = load_model() if load_model else str(model_path)
+    return onnxruntime.InferenceSession(model, sess_options=sess_options, providers=providers)
+
+
+def load_voice_model_with_alignments() -> bytes:
+    """Load the Piper voice model with its phoneme alignment output exposed.
+
+    Returns:
+        Serialized ONNX model
+    """
+    import onnx
+    from piper.patch_voice_with_alignment import add_alignment_output
+
+    model = onnx.load(str(MODEL_PATH))
+    try:
+        add_alignment_output(model)
+    except ValueError:
+        pass  # Model file is already patched
+
+    return model.SerializeToString()
+
+
+def get_voice(num_threads: int | None = None):
+    """Load the Piper voice model, caching it for subsequent calls.
+
+    ONNX Runtime fixes a session's thread count when it is created, so each
+    thread count gets its own session.
+
+    Args:
+        num_threads: Intra-op thread count (default: every core)
+
+    Returns:
+        PiperVoice backed by an ONNX Runtime session
+    """
+    num_threads = num_threads or os.cpu_count()
+    if num_threads not in _VOICES:
+        # Import Piper here to avoid import overhead when not needed
+        from piper import PiperConfig, PiperVoice
+
+        with open(CONFIG_PATH, encoding="utf-8") as f:
+            config = PiperConfig.from_dict(json.load(f))
+
+        # PiperVoice.load() leaves the session at ONNX Runtime's defaults,
+        # which use only part of the available cores; build it ourselves. The
+        # model is patched to expose the per-phoneme sample counts it computes
+        # internally, so word timings can come straight out of synthesis.
+        # Without the patch helper, word timings fall back to ForceAlign.
+        try:
+            import onnx  # noqa: F401
+            from piper.patch_voice_with_alignment import add_alignment_output  # noqa: F401
+
+            load_model, variant = load_voice_model_with_alignments, "alignments"
+        except ImportError:
+            load_model, variant = None, None
+
+        session = create_session(MODEL_PATH, load_model=load_model, num_threads=num_threads, variant=variant)
+
+        _VOICES[num_threads] = PiperVoice(session=session, config=config)
+
+    return _VOICES[num_threads]
+
+
+def synthesize(text: str, num_threads: int | None = None) -> tuple[list[np.ndarray], int, list[tuple[int, int]] | None]:
+    """Synthesize speech for text with the cached Piper voice.
+
+    Args:
+        text: Text to speak
+        num_threads: Cores to synthesize on (default: every core)
+
+    Returns:
+        Tuple of (audio segments, sample rate, word spans). Audio segments are
+        consecutive mono int16 sample arrays, one per sentence Piper spoke.
+        Word spans are (start, end) sample offsets of each spoken word, or
+        None when Piper did not report phoneme alignments.
+    """
+    from piper.const import BOS, EOS
+
+    voice = get_voice(num_threads)
+
+    # Piper yields one chunk per sentence
+    chunks = list(voice.synthesize(text, include_alignments=True))
+    segments = [chunk.audio_int16_array for chunk in chunks]
+
+    # Words are runs of phonemes between spaces, punctuation and the sentence
+    # start/end markers
+    word_spans = []
+    offset = 0
+    for chunk in chunks:
+        if chunk.phoneme_alignments is None:
+            word_spans = None
+            break
+
+        position = offset
+        word_start = None
+        for alignment in chunk.phoneme_alignments:
+            is_boundary = alignment.phoneme in (BOS, EOS, " ") or alignment.phoneme in PUNCTUATION_PHONEMES
+            if is_boundary and word_start is not None:
+                word_spans.append((word_start, position))
+                word_start = None
+            elif not is_boundary and word_start is None:
+                word_start = position
+            position += alignment.num_samples
+
+        if word_start is not None:
+            word_spans.append((word_start, position))
+        offset += len(chunk.audio_float_array)
+
+    return segments, voice.config.sample_rate, word_spans
+
+
+def join_segments(segments: list[np.ndarray]) -> np.ndarray:
+    """Join audio segments into one array, without copying a single segment."""
+    if len(segments) == 1:
+        return segments[0]
+    return np.concatenate(segments) if segments else np.zeros(0, dtype=np.int16)
+
+
+def transcript_words(text: str) -> list[str]:
+    """Split text into words the way ForceAlign does (letters only, uppercase)."""
+    return re.sub(r"[^a-zA-Z\s]", "", text).upper().split()
+
+
+def phoneme_timestamps(transcript: str, word_spans: list[tuple[int, int]] | None, sample_rate: int) -> list[dict] | None:
+    """Word-level timestamps from Piper's phoneme alignments.
+
+    Args:
+        transcript: Original text transcript
+        word_spans: Word spans returned by synthesize
+        sample_rate: Sample rate of the audio in Hz
+
+    Returns:
+        List of word timing dicts with 'word', 'start', 'end' keys, or None if
+        the spoken words cannot be matched to the transcript one to one (see
+        SPOKEN_EXPANSION)
+    """
+    words = transcript_words(transcript)
+    if word_spans is None or len(word_spans) != len(words) or SPOKEN_EXPANSION.search(transcript):
+        return None
+
+    return [
+        {"word": word, "start": round(start / sample_rate, 3), "end": round(end / sample_rate, 3)}
+        for word, (start, end) in zip(words, word_spans)
     ]
 
-    result = subprocess.run(
-        ffmpeg_cmd,
-        capture_output=True,
-    )
 
-    if result.returncode != 0:
-        raise RuntimeError(f"FFmpeg padding failed: {result.stderr.decode()}")
+def write_padded_wav(output_path: Path, segments: list[np.ndarray], sample_rate: int) -> Path:
+    """Write audio segments to a WAV file with silence padding.
+
+    Adds SILENCE_PADDING_START and SILENCE_PADDING_END seconds of silence.
+    Segments are streamed to the file one at a time, so the padded audio is
+    never assembled in memory.
+
+    Args:
+        output_path: Path for output WAV file
+        segments: Consecutive mono int16 sample arrays
+        sample_rate: Sample rate of the audio in Hz
+
+    Returns:
+        Path to the padded WAV file
+    """
+    if sample_rate != SAMPLE_RATE:
+        raise ValueError(f"Expected {SAMPLE_RATE}Hz audio from Piper, got {sample_rate}Hz")
+
+    with wave.open(str(output_path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(SAMPLE_WIDTH)
+        wav_file.setframerate(SAMPLE_RATE)
+        wav_file.writeframes(_START_SILENCE)
+        for segment in segments:
+            wav_file.writeframes(segment)
+        wav_file.writeframes(_END_SILENCE)
 
     return output_path
 
 
-def extract_timestamps(audio_path: Path, transcript: str) -> list[dict]:
-    """Extract word-level timestamps using ForceAlign.
+def set_aligner_device(device: str) -> None:
+    """Choose the device the wav2vec2 aligner runs on.
+
+    Args:
+        device: "cpu", or "cuda" to use a GPU when one is available. The
+            exported model runs on CUDA only with onnxruntime-gpu installed
+            in place of onnxruntime; otherwise the PyTorch model is used.
+    """
+    global _ALIGNER_DEVICE, _ALIGNER_MODEL, _ALIGNER_PRELOAD
+    if device not in ("cpu", "cuda"):
+        raise ValueError(f"Unsupported aligner device: {device}")
+
+    if device != _ALIGNER_DEVICE:
+        # Drop anything already loaded for the previous device
+        _ALIGNER_DEVICE = device
+        _ALIGNER_MODEL = None
+        _ALIGNER_SESSIONS.clear()
+        _ALIGNER_PRELOAD = None
+
+
+def get_aligner_model():
+    """Load ForceAlign's wav2vec2 model, caching it for subsequent calls.
+
+    Returns:
+        wav2vec2 acoustic model on the configured aligner device
+    """
+    global _ALIGNER_MODEL
+    if _ALIGNER_MODEL is None:
+        import torch
+        import torchaudio
+
+        use_cuda = _ALIGNER_DEVICE == "cuda" and torch.cuda.is_available()
+        device = torch.device("cuda" if use_cuda else "cpu")
+        bundle = torchaudio.pipelines.WAV2VEC2_ASR_BASE_960H
+        _ALIGNER_MODEL = bundle.get_model().to(device)
+
+    return _ALIGNER_MODEL
+
+
+def get_aligner_session(num_threads: int | None = None):
+    """Load the exported wav2vec2 ONNX model, caching it for subsequent calls.
+
+    Args:
+        num_threads: Intra-op thread count (default: every core)
+
+    Returns:
+        ONNX Runtime session, or None if the model has not been exported yet
+        or the PyTorch model should run on the GPU instead
+    """
+    num_threads = num_threads or os.cpu_count()
+    if num_threads not in _ALIGNER_SESSIONS:
+        import onnxruntime
+
+        providers = ["CPUExecutionProvider"]
+        if _ALIGNER_DEVICE == "cuda":
+            import torch
+
+            # The default onnxruntime wheel is CPU-only; CUDA needs
+            # onnxruntime-gpu. Without it, prefer torch on the GPU over the
+            # exported model on the CPU.
+            if "CUDAExecutionProvider" in onnxruntime.get_available_providers():
+                providers.insert(0, "CUDAExecutionProvider")
+            elif torch.cuda.is_available():
+                return None
+            else:
+                print("Warning: no CUDA device available, aligning on the CPU", file=sys.stderr)
+
+        # int8 kernels only exist on the CPU; on a GPU they would fall back
+        # to the CPU node by node, so use the float32 model there
+        if providers[0] == "CPUExecutionProvider" and ALIGNER_QUANTIZED_MODEL_PATH.exists():
+            model_path = ALIGNER_QUANTIZED_MODEL_PATH
+        elif ALIGNER_MODEL_PATH.exists():
+            model_path = ALIGNER_MODEL_PATH
+        else:
+            return None
+
+        _ALIGNER_SESSIONS[num_threads] = create_session(model_path, providers, num_threads=num_threads)
+
+    return _ALIGNER_SESSIONS[num_threads]
+
+
+def run_in_background(fn, *args) -> concurrent.futures.Future:
+    """Run fn on the shared background worker thread.
+
+    Args:
+        fn: Callable to run
+        *args: Arguments for fn
+
+    Returns:
+        Future for fn's result
+    """
+    global _BACKGROUND
+    if _BACKGROUND is None:
+        _BACKGROUND = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+    return _BACKGROUND.submit(fn, *args)
+
+
+def load_aligner(num_threads: int | None = None) -> None:
+    """Import ForceAlign and load whichever wav2vec2 model will be used."""
+    import forcealign  # noqa: F401 - pulls in torch, torchaudio and g2p_en
+
+    if get_aligner_session(num_threads) is None:
+        get_aligner_model()
+
+
+def start_aligner_preload(num_threads: int | None = None) -> None:
+    """Start loading the aligner in the background, if not already started.
+
+    The ForceAlign import and model load take seconds on a cold start; doing
+    them while Piper synthesizes hides most of that time.
 
     Args:
-        audio_path: Path to WAV file
+        num_threads: Thread count the aligner will first run with
+    """
+    global _ALIGNER_PRELOAD
+    if _ALIGNER_PRELOAD is None:
+        _ALIGNER_PRELOAD = run_in_background(load_aligner, num_threads)
+
+
+def wait_for_aligner() -> None:
+    """Block until the aligner is loaded, re-raising any error from loading."""
+    start_aligner_preload()
+    _ALIGNER_PRELOAD.result()
+
+
+def to_aligner_waveform(audio: np.ndarray, sample_rate: int):
+    """Convert int16 samples to the float waveform the aligner expects.
+
+    Args:
+        audio: Mono int16 samples
+        sample_rate: Sample rate of the audio in Hz
+
+    Returns:
+        Float tensor of shape (1, samples) at the wav2vec2 sample rate
+    """
+    import torch
+    import torchaudio
+
+    bundle = torchaudio.pipelines.WAV2VEC2_ASR_BASE_960H
+
+    # Scale to [-1, 1) floats, matching what torchaudio.load returns
+    waveform = torch.from_numpy(audio.astype(np.float32) / 32768.0).unsqueeze(0)
+    if sample_rate != bundle.sample_rate:
+        waveform = torchaudio.functional.resample(
+            waveform, orig_freq=sample_rate, new_freq=bundle.sample_rate
+        )
+
+    return waveform
+
+
+def num_emission_frames(num_samples: int) -> int:
+    """Number of emission frames wav2vec2 produces for a waveform length.
+
+    Args:
+        num_samples: Waveform length in samples
+
+    Returns:
+        Frame count after wav2vec2's convolutional feature extractor
+    """
+    # (kernel, stride) of each feature extractor convolution
+    for kernel, stride in [(10, 5)] + [(3, 2)] * 4 + [(2, 2)] * 2:
+        num_samples = (num_samples - kernel) // stride + 1
+    return num_samples
+
+
+def compute_emissions(waveforms: list, num_threads: int | None = None) -> list:
+    """Run the wav2vec2 acoustic model over a batch of waveforms.
+
+    Waveforms of similar length are zero-padded to the longest of them and
+    run in a single pass; frames past each waveform's own length are dropped
+    before returning. Uses the exported ONNX model when available, falling
+    back to PyTorch.
+
+    Padding is masked out of attention, but the feature extractor's
+    normalization still sees it, so emissions for a padded clip differ
+    slightly from those for the clip on its own. Grouping by length
+    (ALIGNER_BATCH_MAX_PADDING) keeps that difference small.
+
+    Args:
+        waveforms: Float tensors of shape (1, samples) at 16kHz
+        num_threads: Cores to run the model on (default: every core)
+
+    Returns:
+        Log-probability tensors of shape (frames, labels) on the CPU, one per waveform
+    """
+    import torch
+
+    lengths = [waveform.size(1) for waveform in waveforms]
+
+    # Batches of clips whose lengths are within the padding limit of each other
+    batches = []
+    for i in sorted(range(len(waveforms)), key=lengths.__getitem__):
+        if batches and lengths[i] <= lengths[batches[-1][0]] * (1 + ALIGNER_BATCH_MAX_PADDING):
+            batches[-1].append(i)
+        else:
+            batches.append([i])
+
+    session = get_aligner_session(num_threads)
+    emissions = [None] * len(waveforms)
+    for indices in batches:
+        batch_lengths = torch.tensor([lengths[i] for i in indices])
+        batch = torch.zeros(len(indices), max(lengths[i] for i in indices))
+        for row, i in enumerate(indices):
+            batch[row, :lengths[i]] = waveforms[i][0]
+
+        if session is not None:
+            # The exported graph already applies log_softmax. Models exported
+            # before it took lengths run unmasked.
+            inputs = {"input": batch.numpy()}
+            if any(model_input.name == "lengths" for model_input in session.get_inputs()):
+                inputs["lengths"] = batch_lengths.numpy()
+            batch_emissions = torch.from_numpy(session.run(None, inputs)[0])
+        else:
+            model = get_aligner_model()
+            device = next(model.parameters()).device
+            torch.set_num_threads(num_threads or os.cpu_count())
+            with torch.inference_mode():
+                batch_emissions, _ = model(batch.to(device), batch_lengths.to(device))
+                batch_emissions = torch.log_softmax(batch_emissions, dim=-1).cpu()
+
+        for row, i in enumerate(indices):
+            emissions[i] = batch_emissions[row, :num_emission_frames(lengths[i])]
+
+    return emissions
+
+
+def align(waveform, emission, transcript: str) -> list[dict]:
+    """Align a transcript against wav2vec2 emissions using ForceAlign.
+
+    Args:
+        waveform: Float tensor of shape (1, samples) at 16kHz
+        emission: Log-probability tensor of shape (frames, labels)
         transcript: Original text transcript
 
     Returns:
         List of word timing dicts with 'word', 'start', 'end' keys
     """
     # Import ForceAlign here to avoid import overhead when not needed
+    import torchaudio
     from forcealign import ForceAlign
+    from forcealign.utils import alphabetical, get_breath_idx
 
-    aligner = ForceAlign(audio_file=str(audio_path), transcript=transcript)
-    words = aligner.inference()
+    bundle = torchaudio.pipelines.WAV2VEC2_ASR_BASE_960H
+
+    # ForceAlign.__init__ reloads the wav2vec2 checkpoint on every call, so set
+    # up the aligner by hand and feed its CTC alignment precomputed emissions
+    aligner = ForceAlign.__new__(ForceAlign)
+    aligner.bundle = bundle
+    aligner.labels = bundle.get_labels()
+    aligner.dictionary = {c: i for i, c in enumerate(aligner.labels)}
+    aligner.waveform = waveform
+    aligner.emission = emission
+    aligner.raw_text = transcript
+    aligner.transcript = f'{"|".join(alphabetical(transcript).upper().split())}|'
+    aligner.tokens = [aligner.dictionary[c] for c in aligner.transcript]
+    aligner.breath_idx = get_breath_idx(transcript)
+    aligner.word_alignments = None
+    aligner.phoneme_alignments = []
+
+    return [
+        {"word": word.word, "start": round(word.time_start, 3), "end": round(word.time_end, 3)}
+        for word in aligner.inference()
+    ]
 
-    timestamps = []
-    for word in words:
-        timestamps.append({
-            "word": word.word,
-            "start": round(word.time_start, 3),
-            "end": round(word.time_end, 3),
-        })
+
+def extract_timestamps_batch(
+    audios: list[np.ndarray], sample_rate: int, transcripts: list[str], num_threads: int | None = None
+) -> list[list[dict]]:
+    """Extract word-level timestamps for several clips in one aligner pass.
+
+    Args:
+        audios: Mono int16 samples for each clip
+        sample_rate: Sample rate of the audio in Hz
+        transcripts: Original text transcript for each clip
+        num_threads: Cores to run the aligner on (default: every core)
+
+    Returns:
+        List of word timing dicts per clip, as returned by extract_timestamps
+    """
+    wait_for_aligner()
+
+    waveforms = [to_aligner_waveform(audio, sample_rate) for audio in audios]
+    emissions = compute_emissions(waveforms, num_threads)
+
+    return [
+        align(waveform, emission, transcript)
+        for waveform, emission, transcript in zip(waveforms, emissions, transcripts)
+    ]
+
+
+def extract_timestamps(audio: np.ndarray, sample_rate: int, transcript: str, num_threads: int | None = None) -> list[dict]:
+    """Extract word-level timestamps using ForceAlign.
+
+    Args:
+        audio: Mono int16 samples
+        sample_rate: Sample rate of the audio in Hz
+        transcript: Original text transcript
+        num_threads: Cores to run the aligner on (default: every core)
+
+    Returns:
+        List of word timing dicts with 'word', 'start', 'end' keys
+    """
+    return extract_timestamps_batch([audio], sample_rate, [transcript], num_threads)[0]
+
+
+def shift_timestamps(timestamps: list[dict], offset: float) -> list[dict]:
+    """Shift word timings by offset seconds, in place.
+
+    Args:
+        timestamps: Word timing dicts with 'start' and 'end' keys
+        offset: Seconds to add to every start and end
+
+    Returns:
+        The same timestamps list
+    """
+    # Shift and round all starts/ends as one (N, 2) array instead of per word
+    times = np.fromiter(
+        (value for ts in timestamps for value in (ts["start"], ts["end"])),
+        dtype=np.float64,
+        count=2 * len(timestamps),
+    ).reshape(-1, 2)
+    times = np.round(times + offset, 3)
+
+    for ts, (start, end) in zip(timestamps, times.tolist()):
+        ts["start"], ts["end"] = start, end
 
     return timestamps
 
 
-def process_text(text: str, output_path: Path) -> dict:
-    """Generate audio and extract timestamps for text.
+def split_sentences(text: str) -> list[str]:
+    """Split text into sentences for pipelined synthesis.
+
+    Args:
+        text: Text to split
+
+    Returns:
+        Non-empty sentences; a fragment is joined to the next one when it ends
+        in an abbreviation, is very short, or the next one starts lowercase
+    """
+    sentences = []
+    for fragment in SENTENCE_BOUNDARY.split(text):
+        if not fragment:
+            continue
+        if sentences and (
+            fragment[0].islower()
+            or ABBREVIATION_END.search(sentences[-1])
+            or len(sentences[-1].split()) < SENTENCE_MIN_WORDS
+        ):
+            sentences[-1] = f"{sentences[-1]} {fragment}"
+        else:
+            sentences.append(fragment)
+    return sentences
+
+
+def synthesize_and_align(text: str) -> tuple[list[np.ndarray], int, list[dict]]:
+    """Synthesize and force-align a text one sentence at a time.
+
+    Piper synthesizes the next sentence on a worker thread while ForceAlign
+    aligns the current one on this thread, each on its own share of the
+    cores (STAGE_THREADS), so long texts take roughly as long as the slower
+    of the two stages rather than their sum. A single sentence has nothing
+    to overlap, so both stages get every core.
 
     Args:
         text: Text to process
+
+    Returns:
+        Tuple of (audio segments, sample rate, word timing dicts relative to
+        the start of the audio)
+    """
+    sentences = split_sentences(text)
+    num_threads = STAGE_THREADS if len(sentences) > 1 else None
+
+    segments = []
+    timestamps = []
+    num_samples = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="piper") as executor:
+        next_audio = executor.submit(synthesize, sentences[0], num_threads)
+        for i, sentence in enumerate(sentences):
+            sentence_segments, sample_rate, _ = next_audio.result()
+            audio = join_segments(sentence_segments)
+            if i + 1 < len(sentences):
+                next_audio = executor.submit(synthesize, sentences[i + 1], num_threads)
+
+            # Shift sentence-relative timings by the audio that precedes it;
+            # sentences without letters (e.g. bare numbers) have nothing to align
+            if transcript_words(sentence):
+                sentence_timestamps = extract_timestamps(audio, sample_rate, sentence, num_threads)
+                timestamps.extend(shift_timestamps(sentence_timestamps, num_samples / sample_rate))
+
+            segments.extend(sentence_segments)
+            num_samples += len(audio)
+
+    return segments, sample_rate, timestamps
+
+
+def save_result(text: str, segments: list[np.ndarray], sample_rate: int, timestamps: list[dict], output_path: Path) -> dict:
+    """Write the padded WAV and timestamps JSON for one processed text.
+
+    Args:
+        text: Text that was spoken
+        segments: Raw (unpadded) audio segments, as returned by synthesize
+        sample_rate: Sample rate of the audio in Hz
+        timestamps: Word timings relative to the raw audio
         output_path: Base path for output files (without extension)
 
     Returns:
         Dict with 'audio_path', 'timestamps_path', and 'timestamps' keys
     """
-    # Clean and normalize text
-    text = text.strip()
-    if not text:
-        raise ValueError("Empty text provided")
-
     wav_path = output_path.with_suffix(".wav")
+    json_path = output_path.with_suffix(".json")
 
-    # Generate raw audio to temp file, extract timestamps, then add padding
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-        raw_audio_path = Path(temp_file.name)
+    # Existing outputs may be hard links into the cache; replace them rather
+    # than writing through to the cached copy
+    wav_path.unlink(missing_ok=True)
+    json_path.unlink(missing_ok=True)
 
-    try:
-        # Generate raw audio using Piper
-        piper_cmd = [
-            str(VENV_BIN / "piper"),
-            "--model", str(MODEL_PATH),
-            "--output_file", str(raw_audio_path),
-        ]
-
-        result = subprocess.run(
-            piper_cmd,
-            input=text.encode("utf-8"),
-            capture_output=True,
-        )
+    # Adjust timestamps to account for start padding
+    shift_timestamps(timestamps, SILENCE_PADDING_START)
+
+    # Add silence padding to create final audio
+    write_padded_wav(wav_path, segments, sample_rate)
+
+    # Calculate total duration including padding
+    total_duration = timestamps[-1]["end"] + SILENCE_PADDING_END if timestamps else 0
+
+    # Save timestamps to JSON
+    json_path.write_bytes(orjson.dumps({
+        "text": text,
+        "timestamps": timestamps,
+        "duration": total_duration,
+    }, option=orjson.OPT_INDENT_2))
 
-        if result.returncode != 0:
-            raise RuntimeError(f"Piper TTS failed: {result.stderr.decode()}")
+    return {
+        "audio_path": str(wav_path),
+        "timestamps_path": str(json_path),
+        "timestamps": timestamps,
+    }
 
-        # Extract timestamps from raw (unpadded) audio
-        timestamps = extract_timestamps(raw_audio_path, text)
 
-        # Adjust timestamps to account for start padding
-        for ts in timestamps:
-            ts["start"] = round(ts["start"] + SILENCE_PADDING_START, 3)
-            ts["end"] = round(ts["end"] + SILENCE_PADDING_START, 3)
+def cache_key(text: str, precise_align: bool) -> str:
+    """Hash of everything that determines the generated output for text.
 
-        # Add silence padding to create final audio
-        add_silence_padding(raw_audio_path, wav_path, SILENCE_PADDING_START, SILENCE_PADDING_END)
+    Args:
+        text: Cleaned text to process
+        precise_align: Whether ForceAlign timings were required
+
+    Returns:
+        Hex digest used as the cache file name
+    """
+    key_data = "\0".join([
+        text, DEFAULT_MODEL, str(SILENCE_PADDING_START), str(SILENCE_PADDING_END), str(precise_align),
+    ])
+    return hashlib.blake2b(key_data.encode("utf-8"), digest_size=16).hexdigest()
 
-        # Calculate total duration including padding
-        total_duration = timestamps[-1]["end"] + SILENCE_PADDING_END if timestamps else 0
 
+def link_or_copy(source: Path, destination: Path) -> None:
+    """Hard-link source to destination, copying if linking is not possible.
+
+    The link or copy is made under a temporary name and renamed over
+    destination, so readers never see a partial file and an existing
+    destination (which may be a hard link to other output) is replaced
+    rather than written through.
+    """
+    temp_path = destination.with_name(f".{destination.name}.{os.getpid()}.tmp")
+    try:
+        try:
+            os.link(source, temp_path)
+        except OSError as e:
+            # Different filesystems, or one without hard links
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+                raise
+            shutil.copyfile(source, temp_path)
+        os.replace(temp_path, destination)
     finally:
-        # Clean up temp file
-        if raw_audio_path.exists():
-            raw_audio_path.unlink()
+        temp_path.unlink(missing_ok=True)
 
-    # Save timestamps to JSON
+
+def load_cached(text: str, output_path: Path, precise_align: bool) -> dict | None:
+    """Place previously generated output for text at output_path.
+
+    Args:
+        text: Cleaned text to process
+        output_path: Base path for output files (without extension)
+        precise_align: Whether ForceAlign timings are required
+
+    Returns:
+        Result dict as returned by process_text, or None on a cache miss
+    """
+    key = cache_key(text, precise_align)
+    cached_wav = CACHE_DIR / f"{key}.wav"
+    cached_json = CACHE_DIR / f"{key}.json"
+    if not (cached_wav.exists() and cached_json.exists()):
+        return None
+
+    wav_path = output_path.with_suffix(".wav")
     json_path = output_path.with_suffix(".json")
-    with open(json_path, "w") as f:
-        json.dump({
-            "text": text,
-            "timestamps": timestamps,
-            "duration": total_duration,
-        }, f, indent=2)
+    link_or_copy(cached_wav, wav_path)
+    link_or_copy(cached_json, json_path)
+
+    # Mark as recently used; atime alone is unreliable on noatime mounts
+    os.utime(cached_json)
+
+    with open(json_path) as f:
+        timestamps = json.load(f)["timestamps"]
 
     return {
         "audio_path": str(wav_path),
@@ -177,37 +894,356 @@ def process_text(text: str, output_path: Path) -> dict:
     }
 
 
+def store_cached(text: str, result: dict, precise_align: bool) -> None:
+    """Save generated output for text to the cache.
+
+    Args:
+        text: Cleaned text that was processed
+        result: Result dict as returned by process_text
+        precise_align: Whether ForceAlign timings were required
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    # WAV first, so a half-written entry is never seen as complete
+    key = cache_key(text, precise_align)
+    link_or_copy(Path(result["audio_path"]), CACHE_DIR / f"{key}.wav")
+    link_or_copy(Path(result["timestamps_path"]), CACHE_DIR / f"{key}.json")
+
+
+def evict_cache(max_bytes: int = CACHE_MAX_BYTES) -> None:
+    """Remove the least recently used cache entries until the cache fits in max_bytes."""
+    if not CACHE_DIR.exists():
+        return
+
+    entries = []
+    total_bytes = 0
+    for json_path in CACHE_DIR.glob("*.json"):
+        wav_path = json_path.with_suffix(".wav")
+        try:
+            size = json_path.stat().st_size + (wav_path.stat().st_size if wav_path.exists() else 0)
+            entries.append((os.path.getatime(json_path), size, json_path, wav_path))
+        except FileNotFoundError:
+            continue  # Evicted by another process meanwhile
+        total_bytes += size
+
+    for _, size, json_path, wav_path in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        json_path.unlink(missing_ok=True)
+        wav_path.unlink(missing_ok=True)
+        total_bytes -= size
+
+
+def process_texts(
+    texts: list[str], output_paths: list[Path], use_cache: bool = True, precise_align: bool = False
+) -> list[dict]:
+    """Generate audio and extract timestamps for several texts at once.
+
+    Piper synthesizes each text in turn with the shared voice model. Short
+    texts take their word timings from Piper's phoneme alignments, falling
+    back to the aligner as a single padded batch. Long texts are synthesized
+    and aligned sentence by sentence (see synthesize_and_align). Texts
+    already in the cache are copied from there instead.
+
+    Args:
+        texts: Texts to process
+        output_paths: Base path for each text's output files (without extension)
+        use_cache: Reuse and store previously generated output
+        precise_align: Always use ForceAlign for word timings
+
+    Returns:
+        List of result dicts, as returned by process_text
+    """
+    if len(texts) != len(output_paths):
+        raise ValueError("Expected one output path per text")
+
+    # Clean and normalize text
+    texts = [text.strip() for text in texts]
+    if not all(texts):
+        raise ValueError("Empty text provided")
+
+    results = [None] * len(texts)
+    if use_cache:
+        for i, (text, output_path) in enumerate(zip(texts, output_paths)):
+            results[i] = load_cached(text, output_path, precise_align)
+
+    pending = [i for i, result in enumerate(results) if result is None]
+    if not pending:
+        return results
+
+    # Load the aligner while Piper is busy, if it is going to be needed
+    use_phoneme_timing = {
+        i: (
+            not precise_align
+            and len(transcript_words(texts[i])) <= PHONEME_TIMING_MAX_WORDS
+            and not SPOKEN_EXPANSION.search(texts[i])
+        )
+        for i in pending
+    }
+    forcealign_texts = [texts[i] for i in pending if not use_phoneme_timing[i]]
+    if forcealign_texts:
+        pipelined = any(len(split_sentences(text)) > 1 for text in forcealign_texts)
+        start_aligner_preload(STAGE_THREADS if pipelined else None)
+
+    # Keep the raw audio in memory: align the unpadded samples, then write
+    # the padded WAVs once
+    audios = {}
+    all_timestamps = {}
+    for i in pending:
+        if use_phoneme_timing[i]:
+            audios[i], sample_rate, word_spans = synthesize(texts[i])
+            all_timestamps[i] = phoneme_timestamps(texts[i], word_spans, sample_rate)
+        else:
+            audios[i], sample_rate, all_timestamps[i] = synthesize_and_align(texts[i])
+
+    # Extract timestamps Piper could not provide from raw (unpadded) audio
+    # with ForceAlign
+    to_align = [i for i in pending if all_timestamps.get(i) is None]
+    if to_align:
+        aligned = extract_timestamps_batch(
+            [join_segments(audios[i]) for i in to_align], sample_rate, [texts[i] for i in to_align]
+        )
+        all_timestamps.update(zip(to_align, aligned))
+
+    for i in pending:
+        results[i] = save_result(texts[i], audios[i], sample_rate, all_timestamps[i], output_paths[i])
+        if use_cache:
+            store_cached(texts[i], results[i], precise_align)
+
+    if use_cache:
+        run_in_background(evict_cache)
+
+    return results
+
+
+def process_text(text: str, output_path: Path, use_cache: bool = True, precise_align: bool = False) -> dict:
+    """Generate audio and extract timestamps for text.
+
+    Args:
+        text: Text to process
+        output_path: Base path for output files (without extension)
+        use_cache: Reuse and store previously generated output
+        precise_align: Always use ForceAlign for word timings
+
+    Returns:
+        Dict with 'audio_path', 'timestamps_path', and 'timestamps' keys
+    """
+    return process_texts([text], [output_path], use_cache=use_cache, precise_align=precise_align)[0]
+
+
+class TtsRequestHandler(socketserver.StreamRequestHandler):
+    """Handles newline-delimited JSON requests on a --serve socket.
+
+    Each request line is {"text", "output", "use_cache", "precise_align",
+    "device"}; each response line is the process_text result or
+    {"error": message}, with "device_mismatch" set when the request asked
+    for a different aligner device than the server runs.
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                device = request.get("device", _ALIGNER_DEVICE)
+                if device != _ALIGNER_DEVICE:
+                    response = {
+                        "error": f"Server aligns on {_ALIGNER_DEVICE}, not {device}",
+                        "device_mismatch": True,
+                    }
+                else:
+                    response = process_text(
+                        request["text"],
+                        Path(request["output"]),
+                        use_cache=request.get("use_cache", True),
+                        precise_align=request.get("precise_align", False),
+                    )
+            except Exception as e:
+                response = {"error": str(e)}
+
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+def serve(socket_path: Path) -> None:
+    """Serve TTS requests over a Unix socket until interrupted.
+
+    Args:
+        socket_path: Path of the Unix socket to listen on
+    """
+    # Load everything up front so the first request is as fast as the rest,
+    # both for running alone and for pipelining long texts
+    start_aligner_preload()
+    get_voice()
+    get_voice(STAGE_THREADS)
+    wait_for_aligner()
+    load_aligner(STAGE_THREADS)
+
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        # Only clear the path if it is a stale socket, never a live server
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(socket_path))
+        except ConnectionRefusedError:
+            socket_path.unlink()
+        else:
+            raise RuntimeError(f"A TTS server is already listening on {socket_path}")
+        finally:
+            probe.close()
+
+    # Requests name arbitrary output paths, so only our user may connect
+    old_umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(str(socket_path), TtsRequestHandler)
+    finally:
+        os.umask(old_umask)
+
+    with server:
+        print(f"Listening on {socket_path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+def request_from_server(socket_path: Path, text: str, output_path: Path, use_cache: bool, precise_align: bool) -> dict | None:
+    """Have a running --serve process generate audio for text.
+
+    Args:
+        socket_path: Path of the server's Unix socket
+        text: Text to process
+        output_path: Base path for output files (without extension)
+        use_cache: Reuse and store previously generated output
+        precise_align: Always use ForceAlign for word timings
+
+    Returns:
+        Result dict as returned by process_text, or None if no server is
+        running, it exited mid-request, or it aligns on another device
+    """
+    # Only trust a server run by our own user
+    try:
+        if socket_path.stat().st_uid != os.getuid():
+            return None
+    except OSError:
+        return None
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(SERVER_CONNECT_TIMEOUT)
+    try:
+        client.connect(str(socket_path))
+    except OSError:
+        # No server, a stale socket, one owned by another user, or a server
+        # too busy to accept
+        client.close()
+        return None
+    client.settimeout(SERVER_TIMEOUT)
+
+    request = {
+        "text": text,
+        # The server has its own working directory
+        "output": str(output_path.resolve()),
+        "use_cache": use_cache,
+        "precise_align": precise_align,
+        "device": _ALIGNER_DEVICE,
+    }
+
+    with client, client.makefile("rwb") as stream:
+        try:
+            stream.write(json.dumps(request).encode("utf-8") + b"\n")
+            stream.flush()
+            line = stream.readline()
+        except TimeoutError:
+            raise RuntimeError(f"TTS server at {socket_path} did not respond within {SERVER_TIMEOUT}s") from None
+        except (BrokenPipeError, ConnectionResetError):
+            line = b""
+
+    # The server exited before replying
+    if not line:
+        return None
+
+    response = json.loads(line)
+    if response.get("device_mismatch"):
+        return None
+    if "error" in response:
+        raise RuntimeError(response["error"])
+
+    return response
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Generate TTS audio with word timestamps"
     )
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("--text", help="Text to convert to speech")
-    group.add_argument("--input", type=Path, help="Input file containing text")
+    group.add_argument("--input", type=Path, help="Input file containing text ('-' for stdin)")
+    group.add_argument(
+        "--serve",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_SOCKET_PATH,
+        metavar="SOCKET",
+        help=f"Keep models loaded and serve requests on a Unix socket (default: {DEFAULT_SOCKET_PATH})",
+    )
 
     parser.add_argument(
         "--output", "-o",
         type=Path,
-        required=True,
         help="Output path (without extension). Creates .wav and .json files",
     )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=DEFAULT_SOCKET_PATH,
+        help="Socket of a --serve process to use when one is running",
+    )
     parser.add_argument(
         "--json-only",
         action="store_true",
         help="Only output JSON result to stdout (for programmatic use)",
     )
+    parser.add_argument(
+        "--device",
+        choices=["cpu", "cuda"],
+        default="cpu",
+        help="Device for word alignment (Piper always runs on the CPU); the exported "
+        "aligner needs onnxruntime-gpu for cuda, otherwise PyTorch runs it",
+    )
+    parser.add_argument(
+        "--precise-align",
+        action="store_true",
+        help="Always use ForceAlign for word timings, even for short texts",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Always regenerate instead of reusing output cached in {CACHE_DIR}",
+    )
 
     args = parser.parse_args()
+    set_aligner_device(args.device)
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    if args.output is None:
+        parser.error("--output is required unless --serve is given")
 
-    # Get text from argument or file
+    # Get text from argument, stdin or file
     if args.text:
         text = args.text
+    elif args.input == Path("-"):
+        text = sys.stdin.buffer.read().decode("utf-8")
     else:
-        with open(args.input) as f:
-            text = f.read()
+        text = args.input.read_text(encoding="utf-8")
 
     try:
-        result = process_text(text, args.output)
+        # Prefer a running server, which already has the models loaded
+        result = request_from_server(args.socket, text, args.output, not args.no_cache, args.precise_align)
+        if result is None:
+            result = process_text(text, args.output, use_cache=not args.no_cache, precise_align=args.precise_align)
 
         if args.json_only:
             print(json.dumps(result))
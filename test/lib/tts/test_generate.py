@@ -0,0 +1,319 @@
+"""
+Tests for the pure helpers in lib/tts/generate.py
+
+Piper's output is fabricated, so no models are needed.
+
+Usage:
+    python -m unittest discover -s test/lib/tts
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[3] / "lib" / "tts"))
+
+import generate  # noqa: E402
+
+SAMPLE_RATE = 1000
+
+
+def fake_chunk(phonemes: list[tuple[str, int]]) -> SimpleNamespace:
+    """An AudioChunk-like sentence with one alignment per (phoneme, num_samples)."""
+    num_samples = sum(count for _, count in phonemes)
+    return SimpleNamespace(
+        audio_int16_array=np.zeros(num_samples, dtype=np.int16),
+        audio_float_array=np.zeros(num_samples, dtype=np.float32),
+        phoneme_alignments=[SimpleNamespace(phoneme=phoneme, num_samples=count) for phoneme, count in phonemes],
+    )
+
+
+def fake_voice(chunks: list[SimpleNamespace]) -> SimpleNamespace:
+    """A PiperVoice-like object whose synthesize yields the given chunks."""
+    return SimpleNamespace(
+        synthesize=lambda text, include_alignments=False: iter(chunks),
+        config=SimpleNamespace(sample_rate=SAMPLE_RATE),
+    )
+
+
+class SynthesizeTest(unittest.TestCase):
+    def synthesize(self, chunks):
+        with mock.patch.object(generate, "get_voice", return_value=fake_voice(chunks)):
+            return generate.synthesize("ignored")
+
+    def test_groups_phonemes_between_spaces_into_words(self):
+        chunk = fake_chunk([("^", 5), ("h", 10), ("i", 10), (" ", 5), ("j", 10), ("o", 10), ("$", 5)])
+
+        segments, sample_rate, word_spans = self.synthesize([chunk])
+
+        self.assertEqual(sample_rate, SAMPLE_RATE)
+        self.assertEqual(len(segments), 1)
+        self.assertEqual(word_spans, [(5, 25), (30, 50)])
+
+    def test_punctuation_ends_a_word(self):
+        chunk = fake_chunk([("^", 0), ("h", 10), (",", 20), (" ", 5), ("j", 10), ("!", 15), ("$", 0)])
+
+        _, _, word_spans = self.synthesize([chunk])
+
+        self.assertEqual(word_spans, [(0, 10), (35, 45)])
+
+    def test_offsets_later_sentences_by_earlier_audio(self):
+        first = fake_chunk([("^", 5), ("h", 10), ("$", 5)])
+        second = fake_chunk([("^", 5), ("j", 10), ("o", 10), ("$", 5)])
+
+        segments, _, word_spans = self.synthesize([first, second])
+
+        self.assertEqual(len(segments), 2)
+        self.assertEqual(word_spans, [(5, 15), (25, 45)])
+
+    def test_missing_alignments_give_no_spans(self):
+        chunk = fake_chunk([("^", 5), ("h", 10), ("$", 5)])
+        chunk.phoneme_alignments = None
+
+        _, _, word_spans = self.synthesize([fake_chunk([("h", 10)]), chunk])
+
+        self.assertIsNone(word_spans)
+
+
+class PhonemeTimestampsTest(unittest.TestCase):
+    def test_converts_spans_to_seconds(self):
+        timestamps = generate.phoneme_timestamps("Hello, world!", [(5, 250), (300, 1234)], SAMPLE_RATE)
+
+        self.assertEqual(timestamps, [
+            {"word": "HELLO", "start": 0.005, "end": 0.25},
+            {"word": "WORLD", "start": 0.3, "end": 1.234},
+        ])
+
+    def test_expanded_numbers_fall_back(self):
+        # "3" is spoken as "three" but has no letters in the transcript
+        spans = [(0, 100), (100, 200), (200, 300), (300, 400)]
+
+        self.assertIsNone(generate.phoneme_timestamps("I have 3 cats", spans, SAMPLE_RATE))
+
+    def test_offsetting_expansion_and_merge_fall_back(self):
+        # Spoken as "route six in-the city": "6" adds a word and "in the"
+        # merges two, so the counts match but later words would be shifted
+        spans = [(0, 100), (100, 200), (200, 300), (300, 400)]
+
+        self.assertIsNone(generate.phoneme_timestamps("Route 6 in the city", spans, SAMPLE_RATE))
+
+    def test_acronyms_and_hyphenated_words_fall_back(self):
+        spans = [(0, 100), (100, 200), (200, 300)]
+
+        self.assertIsNone(generate.phoneme_timestamps("The FBI agreed", spans, SAMPLE_RATE))
+        self.assertIsNone(generate.phoneme_timestamps("A well-known fact", spans, SAMPLE_RATE))
+
+    def test_missing_spans_fall_back(self):
+        self.assertIsNone(generate.phoneme_timestamps("Hello", None, SAMPLE_RATE))
+
+    def test_spans_from_several_sentences(self):
+        first = fake_chunk([("^", 100), ("h", 200), (".", 100), ("$", 100)])
+        second = fake_chunk([("^", 100), ("j", 300), ("o", 200), ("$", 100)])
+        with mock.patch.object(generate, "get_voice", return_value=fake_voice([first, second])):
+            _, sample_rate, word_spans = generate.synthesize("Hi. Yo")
+
+        timestamps = generate.phoneme_timestamps("Hi. Yo", word_spans, sample_rate)
+
+        self.assertEqual(timestamps, [
+            {"word": "HI", "start": 0.1, "end": 0.3},
+            {"word": "YO", "start": 0.6, "end": 1.1},
+        ])
+
+
+class SplitSentencesTest(unittest.TestCase):
+    def test_splits_after_sentence_punctuation(self):
+        self.assertEqual(
+            generate.split_sentences("The meeting was led by Tom. Everyone agreed with the plan! Did you?"),
+            ["The meeting was led by Tom.", "Everyone agreed with the plan!", "Did you?"],
+        )
+
+    def test_very_short_sentences_join_the_next(self):
+        self.assertEqual(
+            generate.split_sentences("Yes. That is right."),
+            ["Yes. That is right."],
+        )
+
+    def test_short_capitalized_words_end_sentences(self):
+        self.assertEqual(
+            generate.split_sentences("So did I. We left at noon."),
+            ["So did I.", "We left at noon."],
+        )
+
+    def test_abbreviations_and_initials_do_not_end_sentences(self):
+        self.assertEqual(
+            generate.split_sentences("Mr. Smith met Dr. Jones today. U.S. troops arrived later."),
+            ["Mr. Smith met Dr. Jones today.", "U.S. troops arrived later."],
+        )
+
+    def test_lowercase_continuation_joins_previous_sentence(self):
+        self.assertEqual(
+            generate.split_sentences("How are you today? fine thanks, mate."),
+            ["How are you today? fine thanks, mate."],
+        )
+
+    def test_empty_text(self):
+        self.assertEqual(generate.split_sentences(""), [])
+
+
+@unittest.skipUnless(importlib.util.find_spec("forcealign"), "forcealign is not installed")
+class AlignTest(unittest.TestCase):
+    def test_inference_runs_on_a_hand_built_aligner(self):
+        # align() bypasses ForceAlign.__init__, so this catches internals
+        # changing under it; random emissions still yield one span per word
+        import torch
+        import torchaudio
+
+        num_labels = len(torchaudio.pipelines.WAV2VEC2_ASR_BASE_960H.get_labels())
+        waveform = torch.zeros(1, 16000)
+        emission = torch.log_softmax(torch.randn(generate.num_emission_frames(16000), num_labels), dim=-1)
+
+        timestamps = generate.align(waveform, emission, "Hello, world!")
+
+        self.assertEqual([timestamp["word"] for timestamp in timestamps], ["HELLO", "WORLD"])
+        for timestamp in timestamps:
+            self.assertLessEqual(0, timestamp["start"])
+            self.assertLessEqual(timestamp["start"], timestamp["end"])
+            self.assertLessEqual(timestamp["end"], 1.0)
+
+
+class CacheTest(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.dir = Path(temp_dir.name)
+        patcher = mock.patch.object(generate, "CACHE_DIR", self.dir / "cache")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write_output(self, name: str, audio: bytes, timestamps: list[dict]) -> dict:
+        wav_path = self.dir / f"{name}.wav"
+        json_path = self.dir / f"{name}.json"
+        wav_path.write_bytes(audio)
+        json_path.write_text(json.dumps({"timestamps": timestamps}))
+        return {"audio_path": str(wav_path), "timestamps_path": str(json_path), "timestamps": timestamps}
+
+    def test_hit_places_cached_output(self):
+        timestamps = [{"word": "HI", "start": 0.15, "end": 0.4}]
+        generate.store_cached("Hi", self.write_output("first", b"audio", timestamps), precise_align=False)
+
+        result = generate.load_cached("Hi", self.dir / "second", precise_align=False)
+
+        self.assertEqual(result["timestamps"], timestamps)
+        self.assertEqual((self.dir / "second.wav").read_bytes(), b"audio")
+
+    def test_miss_on_other_text_or_settings(self):
+        generate.store_cached("Hi", self.write_output("first", b"audio", []), precise_align=False)
+
+        self.assertIsNone(generate.load_cached("Bye", self.dir / "second", precise_align=False))
+        self.assertIsNone(generate.load_cached("Hi", self.dir / "second", precise_align=True))
+
+    def test_replacing_linked_output_leaves_cache_intact(self):
+        generate.store_cached("Hi", self.write_output("first", b"cached", []), precise_align=False)
+        generate.load_cached("Hi", self.dir / "second", precise_align=False)
+        replacement = self.dir / "replacement.wav"
+        replacement.write_bytes(b"new")
+
+        generate.link_or_copy(replacement, self.dir / "second.wav")
+
+        self.assertEqual((self.dir / "second.wav").read_bytes(), b"new")
+        self.assertEqual(generate.load_cached("Hi", self.dir / "third", precise_align=False)["timestamps"], [])
+        self.assertEqual((self.dir / "third.wav").read_bytes(), b"cached")
+
+    def test_evicts_least_recently_used_first(self):
+        for age, text in enumerate(["oldest", "middle", "newest"]):
+            generate.store_cached(text, self.write_output(text, b"x" * 100, []), precise_align=False)
+            json_path = generate.CACHE_DIR / f"{generate.cache_key(text, False)}.json"
+            os.utime(json_path, (1000 + age, 1000 + age))
+        entry_size = 100 + len(json.dumps({"timestamps": []}))
+
+        generate.evict_cache(max_bytes=2 * entry_size)
+
+        self.assertIsNone(generate.load_cached("oldest", self.dir / "out", precise_align=False))
+        self.assertIsNotNone(generate.load_cached("middle", self.dir / "out", precise_align=False))
+        self.assertIsNotNone(generate.load_cached("newest", self.dir / "out", precise_align=False))
+
+
+class NumEmissionFramesTest(unittest.TestCase):
+    def test_one_second_at_16khz(self):
+        self.assertEqual(generate.num_emission_frames(16000), 49)
+
+    def test_shortest_waveform_with_a_frame(self):
+        self.assertEqual(generate.num_emission_frames(400), 1)
+
+    def test_one_frame_per_20ms(self):
+        self.assertEqual(generate.num_emission_frames(32000) - generate.num_emission_frames(16000), 50)
+
+
+
+@unittest.skipUnless(importlib.util.find_spec("torch"), "torch is not installed")
+class ComputeEmissionsTest(unittest.TestCase):
+    class FakeSession:
+        """An aligner session whose emissions hold each row's waveform length."""
+
+        def __init__(self):
+            self.batch_lengths = []
+
+        def get_inputs(self):
+            return [SimpleNamespace(name="input"), SimpleNamespace(name="lengths")]
+
+        def run(self, output_names, inputs):
+            batch, lengths = inputs["input"], inputs["lengths"]
+            self.batch_lengths.append(lengths.tolist())
+            frames = generate.num_emission_frames(batch.shape[1])
+            return [np.broadcast_to(lengths[:, None, None], (len(lengths), frames, 29)).astype(np.float32)]
+
+    def test_batches_similar_lengths_and_trims_frames(self):
+        import torch
+
+        session = self.FakeSession()
+        waveforms = [torch.ones(1, 32000), torch.ones(1, 16000), torch.ones(1, 16800)]
+        with mock.patch.object(generate, "get_aligner_session", return_value=session):
+            emissions = generate.compute_emissions(waveforms)
+
+        self.assertEqual(session.batch_lengths, [[16000, 16800], [32000]])
+        for waveform, emission in zip(waveforms, emissions):
+            length = waveform.size(1)
+            self.assertEqual(emission.shape, (generate.num_emission_frames(length), 29))
+            self.assertTrue(torch.all(emission == length))
+
+
+class ShiftTimestampsTest(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(generate.shift_timestamps([], 0.15), [])
+
+    def test_shifts_and_rounds_in_place(self):
+        timestamps = [
+            {"word": "HELLO", "start": 0.0, "end": 0.4004},
+            {"word": "WORLD", "start": 0.5, "end": 1.2},
+        ]
+
+        shifted = generate.shift_timestamps(timestamps, 0.15)
+
+        self.assertIs(shifted, timestamps)
+        self.assertEqual(timestamps, [
+            {"word": "HELLO", "start": 0.15, "end": 0.55},
+            {"word": "WORLD", "start": 0.65, "end": 1.35},
+        ])
+        self.assertIsInstance(timestamps[0]["start"], float)
+
+
+class ProcessTextsTest(unittest.TestCase):
+    def test_rejects_mismatched_output_paths(self):
+        with self.assertRaises(ValueError):
+            generate.process_texts(["One", "Two"], [Path("one")])
+
+    def test_rejects_empty_text(self):
+        with self.assertRaises(ValueError):
+            generate.process_texts(["One", "  "], [Path("one"), Path("two")])
+
+
+if __name__ == "__main__":
+    unittest.main()